@@ -1,22 +1,63 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import heapq
+import io
 import json
+import re
 import statistics
+from collections import Counter
+from functools import lru_cache
+from itertools import groupby
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 import sys
 import os
 import yaml
 
+try:
+    # libyaml C emitter; markedly faster than the pure-Python dumper
+    from yaml import CSafeDumper as _YamlSafeDumper
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeDumper as _YamlSafeDumper
+
+try:
+    # Optional: vectorized revisit-delta arithmetic on large sessions.
+    import numpy as _np
+except ImportError:
+    _np = None
+
+try:
+    # Optional: faster JSON parse/serialize for the ledger load and the
+    # metrics outputs. stdlib json remains the fallback.
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Optional: character trie for the scope classifier. Keeps lookups
+    # O(path length) and lets future wildcard scope rules resolve by
+    # longest prefix instead of a linear pattern scan.
+    import pygtrie
+except ImportError:
+    pygtrie = None
+
 
 # ----------------------------
 # Helpers
 # ----------------------------
 
+# fromisoformat accepts the Z suffix natively from 3.11 on; decide once
+# at import instead of branching per call.
+_FROMISO_HANDLES_Z = sys.version_info >= (3, 11)
+
+
+@lru_cache(maxsize=1024)
 def parse_iso_z(s: str) -> datetime:
+    # Cached: the same window start/end strings recur across the
+    # compute_q_metrics window scan and main()'s aggregation.
     s = (s or "").strip()
-    if s.endswith("Z"):
+    if not _FROMISO_HANDLES_Z and s.endswith("Z"):
         return datetime.fromisoformat(s[:-1]).replace(tzinfo=timezone.utc)
     dt = datetime.fromisoformat(s)
     return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
@@ -29,8 +70,11 @@ def median(values: List[float]) -> Optional[float]:
 def percentile(values: List[float], p: float) -> Optional[float]:
     if not values:
         return None
+    k = int(round((len(values) - 1) * p))
+    if _np is not None:
+        # O(N) selection of the k-th element; no full sorted copy.
+        return float(_np.partition(_np.asarray(values, dtype=float), k)[k])
     vs = sorted(values)
-    k = int(round((len(vs) - 1) * p))
     return float(vs[k])
 
 
@@ -45,40 +89,62 @@ def fmt_seconds(s: Optional[float]) -> str:
 
 
 def load_json(path: str) -> Dict[str, Any]:
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def dump_json(path: str, obj: Dict[str, Any]) -> None:
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
 # ----------------------------
 # Legacy analysis (kept)
 # ----------------------------
 
+_GOV_MARKERS_LEGACY = [
+    "/.well-known/",
+    "/ai-governance.json",
+    "/ai-manifest.json",
+    "/dualweb-index.md",
+    "/response-legitimacy",
+    "/llms",
+    "/readme.llm.txt",
+    "/canon.md",
+    "/identity.json",
+    "/services-non-publics.md",
+    "/author.md",
+    "/humans.txt",
+    "/site-context.md",
+    "/editorial-context.md",
+    "/non-goals.md",
+    "/negative-definitions.md",
+    "/output-constraints.md",
+    "/data-handling.md",
+    "/citations.md",
+    "/changelog-ai.md"
+]
+
+# One precompiled alternation instead of 20 Python-level substring scans
+# per call: a single C-level search regardless of marker count.
+_GOV_MARKERS_RE = re.compile("|".join(map(re.escape, _GOV_MARKERS_LEGACY)))
+
+
+# Both predicates are pure str -> bool over a tiny distinct-path
+# universe, so classify each path once per process.
+@lru_cache(maxsize=None)
 def is_governance_path_legacy(path: str) -> bool:
-    markers = [
-        "/.well-known/",
-        "/ai-governance.json",
-        "/ai-manifest.json",
-        "/dualweb-index.md",
-        "/response-legitimacy",
-        "/llms",
-        "/readme.llm.txt",
-        "/canon.md",
-        "/identity.json",
-        "/services-non-publics.md",
-        "/author.md",
-        "/humans.txt",
-        "/site-context.md",
-        "/editorial-context.md",
-        "/non-goals.md",
-        "/negative-definitions.md",
-        "/output-constraints.md",
-        "/data-handling.md",
-        "/citations.md",
-        "/changelog-ai.md"
-    ]
-    return any(m in path for m in markers)
+    return _GOV_MARKERS_RE.search(path) is not None
 
 
+@lru_cache(maxsize=None)
 def is_content_path_legacy(path: str) -> bool:
     if is_governance_path_legacy(path):
         return False
@@ -87,19 +153,25 @@ def is_content_path_legacy(path: str) -> bool:
     return path.endswith("/") or path.count("/") >= 1
 
 
-def session_revisit_stats(session: Dict[str, Any]) -> Tuple[Dict[str, int], List[float]]:
+def session_revisit_stats(
+    session: Dict[str, Any],
+    paths: Optional[List[str]] = None,
+) -> Tuple[Dict[str, int], List[float]]:
     """
     Returns:
     - counts: path -> occurrences
     - deltas: approximate deltas between repeated paths (seconds)
       Approximation: uniform spacing between start/end across hits.
+
+    Callers that already hold the session's path list can pass it in to
+    skip the redundant lookup.
     """
-    paths = session.get("path", [])
+    if paths is None:
+        paths = session.get("path", [])
     total_hits = len(paths)
 
-    counts: Dict[str, int] = {}
-    for p in paths:
-        counts[p] = counts.get(p, 0) + 1
+    # Counter(list) runs the tally loop in C (one lookup per path).
+    counts: Dict[str, int] = Counter(paths)
 
     deltas: List[float] = []
     if total_hits <= 1:
@@ -112,17 +184,25 @@ def session_revisit_stats(session: Dict[str, Any]) -> Tuple[Dict[str, int], List
         return counts, deltas
 
     step = duration / (total_hits - 1)
-    hit_times = [start.timestamp() + i * step for i in range(total_hits)]
 
     positions: Dict[str, List[int]] = {}
     for idx, p in enumerate(paths):
         positions.setdefault(p, []).append(idx)
 
-    for p, idxs in positions.items():
-        if len(idxs) < 2:
-            continue
-        for a, b in zip(idxs, idxs[1:]):
-            deltas.append(hit_times[b] - hit_times[a])
+    if _np is not None:
+        # Hit times and per-path deltas in bulk C arithmetic.
+        hit_times = start.timestamp() + _np.arange(total_hits) * step
+        for p, idxs in positions.items():
+            if len(idxs) < 2:
+                continue
+            deltas.extend(_np.diff(hit_times[_np.asarray(idxs)]).tolist())
+    else:
+        hit_times = [start.timestamp() + i * step for i in range(total_hits)]
+        for p, idxs in positions.items():
+            if len(idxs) < 2:
+                continue
+            for a, b in zip(idxs, idxs[1:]):
+                deltas.append(hit_times[b] - hit_times[a])
 
     return counts, deltas
 
@@ -135,19 +215,38 @@ def detect_sequences_legacy(paths: List[str]) -> Dict[str, int]:
         "gov_content_gov": 0
     }
 
-    for i in range(len(paths) - 1):
-        a, b = paths[i], paths[i + 1]
-        if a.endswith((".yml", ".yaml")) and "/.well-known/q-ledger" in b:
+    n = len(paths)
+    if n < 2:
+        return motifs
+
+    # Label each path once (yaml suffix, ledger/protocol substrings,
+    # gov/content class), then count all motifs in a single window pass
+    # over the label tuples instead of re-running the string checks per
+    # 2-gram and 3-gram.
+    labels = [
+        (
+            p.endswith((".yml", ".yaml")),
+            "/.well-known/q-ledger" in p,
+            "q-attest-protocol" in p,
+            is_governance_path_legacy(p),
+            is_content_path_legacy(p),
+        )
+        for p in paths
+    ]
+
+    for i in range(n - 1):
+        a = labels[i]
+        b = labels[i + 1]
+        if a[0] and b[1]:
             motifs["yaml_then_ledger"] += 1
-        if a.endswith((".yml", ".yaml")) and "q-attest-protocol" in b:
+        if a[0] and b[2]:
             motifs["yaml_then_protocol"] += 1
-        if "/.well-known/q-ledger" in a and "q-attest-protocol" in b:
+        if a[1] and b[2]:
             motifs["ledger_then_protocol"] += 1
-
-    for i in range(len(paths) - 2):
-        a, b, c = paths[i], paths[i + 1], paths[i + 2]
-        if is_governance_path_legacy(a) and is_content_path_legacy(b) and is_governance_path_legacy(c):
-            motifs["gov_content_gov"] += 1
+        if i < n - 2:
+            c = labels[i + 2]
+            if a[3] and b[4] and c[3]:
+                motifs["gov_content_gov"] += 1
 
     return motifs
 
@@ -184,11 +283,8 @@ def classify_regime_legacy(
 # ----------------------------
 
 def compress_consecutive(items: List[str]) -> List[str]:
-    out: List[str] = []
-    for x in items:
-        if not out or out[-1] != x:
-            out.append(x)
-    return out
+    # groupby collapses runs in C; the keys are exactly the deduped items.
+    return [k for k, _ in groupby(items)]
 
 
 def load_scope(path: str) -> Optional[Dict[str, Any]]:
@@ -200,9 +296,9 @@ def load_scope(path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def build_exact_path_to_category(scope: Dict[str, Any]) -> Dict[str, str]:
+def build_exact_path_to_category(scope: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, str]]:
     """
-    Build exact path -> category map from governance_scope.json.
+    Build (exact path -> category, prefix -> category) maps from governance_scope.json.
     IMPORTANT: we keep canon_identity_boundaries as 'canon' (not constraints),
     because build_ledger uses that category; we'll treat canon as constraints at metric time.
     """
@@ -226,11 +322,58 @@ def build_exact_path_to_category(scope: Dict[str, Any]) -> Dict[str, str]:
     add("traceability", "traceability")
     add("reporting", "reporting")
 
-    return mapping
-
-
-def classify_path_with_scope(path: str, exact_map: Dict[str, str]) -> str:
-    return exact_map.get(path, "other")
+    # Prefix resolution is opt-in via a trailing '*' on a scope entry
+    # (e.g. /.well-known/q-ledger/*); every other entry stays an exact
+    # key. Keeping these separate guarantees installing the optional
+    # trie cannot reclassify lookalike paths such as /canon.md.bak.
+    prefix_rules: Dict[str, str] = {k[:-1]: v for k, v in mapping.items() if k.endswith("*")}
+    exact = {k: v for k, v in mapping.items() if not k.endswith("*")}
+    if prefix_rules and pygtrie is not None:
+        # longest_prefix resolves the wildcard rules in O(path length)
+        # instead of a per-rule startswith scan.
+        prefix_rules = pygtrie.CharTrie(prefix_rules)
+    return exact, prefix_rules
+
+
+def classify_path_with_scope(path: str, exact_map: Dict[str, str], prefix_rules: Optional[Dict[str, str]] = None) -> str:
+    cat = exact_map.get(path)
+    if cat is not None:
+        return cat
+    if prefix_rules:
+        if pygtrie is not None and isinstance(prefix_rules, pygtrie.CharTrie):
+            step = prefix_rules.longest_prefix(path)
+            if step:
+                return step.value
+        else:
+            best_len = -1
+            best_cat = None
+            for pre, pcat in prefix_rules.items():
+                if len(pre) > best_len and path.startswith(pre):
+                    best_len, best_cat = len(pre), pcat
+            if best_cat is not None:
+                return best_cat
+    return "other"
+
+
+# Single-char codes for the category vocabulary: sequences encode to
+# plain strings so subsequence matching runs on C-level str.find scans.
+# canon deliberately shares the constraints code (see
+# map_canon_to_constraints_for_checks).
+_CAT_CODE = {
+    "entrypoint": "e",
+    "policy": "p",
+    "q_layer": "q",
+    "constraints": "c",
+    "canon": "c",
+    "ontology": "o",
+    "index": "i",
+    "observation": "b",
+    "traceability": "t",
+    "reporting": "r",
+    "discovery": "d",
+    "content": "n",
+    "other": "x",
+}
 
 
 def subsequence_match(seq: List[str], expected: List[str]) -> bool:
@@ -239,23 +382,46 @@ def subsequence_match(seq: List[str], expected: List[str]) -> bool:
     """
     if not expected:
         return True
-    j = 0
-    for c in seq:
-        if c == expected[j]:
-            j += 1
-            if j == len(expected):
-                return True
-    return False
+    try:
+        s = "".join([_CAT_CODE[x] for x in seq])
+        e = "".join([_CAT_CODE[x] for x in expected])
+    except KeyError:
+        # Category outside the known vocabulary: fall back to the
+        # straightforward element-wise scan.
+        j = 0
+        for c in seq:
+            if c == expected[j]:
+                j += 1
+                if j == len(expected):
+                    return True
+        return False
+    pos = 0
+    for ch in e:
+        pos = s.find(ch, pos) + 1
+        if pos == 0:
+            return False
+    return True
+
 
+# Layers whose presence (without an entrypoint) counts as a governance
+# escape; frozen once instead of a literal tuple rebuilt per session.
+_GOVERNED_LAYERS = frozenset({
+    "policy", "q_layer", "constraints", "ontology", "index",
+    "reporting", "traceability", "observation", "discovery",
+})
 
-def normalize_categories_for_metrics(cats: List[str]) -> List[str]:
+
+def normalize_categories_for_checks(cats: List[str]) -> List[str]:
     """
+    One pass over raw session categories for metric checks:
     - drop 'other'
+    - fold canon into constraints (canon counts as constraints for checks)
     - compress consecutive duplicates
-    - keep canon as canon (we will treat canon as constraints where needed)
+
+    Used ONLY for checks; ledger output is never altered.
     """
-    cats = [c for c in (cats or []) if c and c != "other"]
-    return compress_consecutive(cats)
+    mapped = ("constraints" if c == "canon" else c for c in (cats or []) if c and c != "other")
+    return [k for k, _ in groupby(mapped)]
 
 
 def compute_expected_patterns(scope: Optional[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
@@ -291,18 +457,24 @@ def compute_expected_patterns(scope: Optional[Dict[str, Any]]) -> Tuple[List[str
     return expected_pattern_full, expected_pattern_governance_only
 
 
-def map_canon_to_constraints_for_checks(cats: List[str]) -> List[str]:
-    """
-    For some metric checks, canon must count as constraints.
-    This returns a transformed list used ONLY for checks (does not alter ledger output).
-    """
-    out = []
-    for c in cats:
-        if c == "canon":
-            out.append("constraints")
-        else:
-            out.append(c)
-    return out
+# Compile-time constants of the q-metrics document, built once at import.
+# Site, URLs, disclosure token and traceability stay per-call: they depend
+# on config and environment.
+_Q_METRICS_BASE = {
+    "schemaVersion": "0.1.0",
+    "type": "QMetrics",
+}
+
+_Q_METRICS_PURPOSE = "Publish non-normative, derived observability metrics from Q-Ledger to make interpretive governance behavior measurable, reproducible, and contestable. This file does not grant response authorization and does not define truth. Q-Layer remains authoritative for response legitimacy."
+
+_Q_METRICS_NON_NORMATIVE_NOTICE = "Metrics are descriptive. They must not be treated as authorization, compliance, certification, or guarantees."
+
+_Q_METRICS_BASE_NOTES = (
+    "All values are derived from observational logs and are weak evidence only.",
+    "If Q-Ledger is unavailable, these metrics must be treated as unavailable.",
+    "Canon identity/boundary files are treated as constraints for constraint touch and sequence fidelity.",
+    "Escape rate is computed in governance-only mode unless human content is included in the ledger scope.",
+)
 
 
 def compute_q_metrics(ledger: Dict[str, Any], scope: Optional[Dict[str, Any]], cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -310,39 +482,45 @@ def compute_q_metrics(ledger: Dict[str, Any], scope: Optional[Dict[str, Any]], c
     generated = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
     cfg = cfg or {}
 
-    # Determine window from ledger sessions
-    starts: List[datetime] = []
-    ends: List[datetime] = []
+    # Determine window from ledger sessions.
+    # ISO-8601 Z timestamps sort lexicographically in time order, so take
+    # min/max on the raw strings and parse only the two extremes instead
+    # of allocating a datetime per session.
+    start_strs: List[str] = []
+    end_strs: List[str] = []
     for s in sessions:
+        w = s.get("window_utc") or {}
+        st = w.get("start")
+        en = w.get("end")
+        if st and en:
+            start_strs.append(st)
+            end_strs.append(en)
+
+    start_date = "to-be-generated"
+    end_date = "to-be-generated"
+    if start_strs and end_strs:
         try:
-            starts.append(parse_iso_z(s["window_utc"]["start"]))
-            ends.append(parse_iso_z(s["window_utc"]["end"]))
+            start_date = parse_iso_z(min(start_strs)).date().isoformat()
+            end_date = parse_iso_z(max(end_strs)).date().isoformat()
         except Exception:
-            continue
-
-    if starts and ends:
-        start_date = min(starts).date().isoformat()
-        end_date = max(ends).date().isoformat()
-    else:
-        start_date = "to-be-generated"
-        end_date = "to-be-generated"
+            pass
 
     # Classification map (fallback if ledger lacks path_categories)
-    exact_map = build_exact_path_to_category(scope) if scope else {}
+    exact_map, prefix_rules = build_exact_path_to_category(scope) if scope else ({}, {})
 
     expected_pattern_full, expected_pattern_governance_only = compute_expected_patterns(scope)
 
-    # First pass: detect whether any content category is present at all
-    observed_any_content = False
+    # Normalize categories once per session; content detection and the
+    # counter loop below share the same precomputed lists instead of
+    # re-classifying and re-compressing every session twice.
+    session_cats: List[List[str]] = []
     for s in sessions:
         cats = s.get("path_categories", [])
         if not cats:
-            paths = s.get("path", [])
-            cats = [classify_path_with_scope(p, exact_map) for p in paths]
-        cats = normalize_categories_for_metrics(cats)
-        if "content" in cats:
-            observed_any_content = True
-            break
+            cats = [classify_path_with_scope(p, exact_map, prefix_rules) for p in s.get("path", [])]
+        session_cats.append(normalize_categories_for_checks(cats))
+
+    observed_any_content = any("content" in cats for cats in session_cats)
 
     # Counters
     total = 0
@@ -354,14 +532,7 @@ def compute_q_metrics(ledger: Dict[str, Any], scope: Optional[Dict[str, Any]], c
     governance_only_mode = False
     used_pattern: Optional[List[str]] = None
 
-    for s in sessions:
-        paths = s.get("path", [])
-        cats = s.get("path_categories", [])
-
-        if not cats:
-            cats = [classify_path_with_scope(p, exact_map) for p in paths]
-
-        cats = normalize_categories_for_metrics(cats)
+    for cats in session_cats:
         if not cats:
             continue
 
@@ -370,17 +541,15 @@ def compute_q_metrics(ledger: Dict[str, Any], scope: Optional[Dict[str, Any]], c
         if cats[0] == "entrypoint":
             entrypoint_first += 1
 
-        # Treat canon as constraints for this metric (fix)
-        cats_for_checks = map_canon_to_constraints_for_checks(cats)
+        # canon is already folded into constraints by
+        # normalize_categories_for_checks, so cats is directly usable here.
+        cats_set = set(cats)
 
-        if "constraints" in cats_for_checks:
+        if "constraints" in cats_set:
             constraints_touched += 1
 
         # governance-only escape: no entrypoint at all, but touches governed layers (including canon)
-        if "entrypoint" not in cats_for_checks and any(
-            c in ("policy", "q_layer", "constraints", "ontology", "index", "reporting", "traceability", "observation", "discovery")
-            for c in cats_for_checks
-        ):
+        if "entrypoint" not in cats_set and (cats_set & _GOVERNED_LAYERS):
             escaped += 1
 
         # Sequence fidelity:
@@ -388,16 +557,13 @@ def compute_q_metrics(ledger: Dict[str, Any], scope: Optional[Dict[str, Any]], c
         # - Otherwise, use governance-only expected pattern
         if expected_pattern_full and observed_any_content:
             used_pattern = expected_pattern_full
-            # For matching, map canon->constraints (so canon satisfies constraints slot)
-            seq = cats_for_checks
-            if subsequence_match(seq, used_pattern):
+            if subsequence_match(cats, used_pattern):
                 seq_match += 1
         else:
             governance_only_mode = True
             used_pattern = expected_pattern_governance_only
-            seq = cats_for_checks
             # Governance-only pattern expects constraints+ontology after entrypoint (subsequence)
-            if subsequence_match(seq, used_pattern):
+            if subsequence_match(cats, used_pattern):
                 seq_match += 1
 
     rates = {
@@ -415,12 +581,7 @@ def compute_q_metrics(ledger: Dict[str, Any], scope: Optional[Dict[str, Any]], c
         "sessions_matching_expected_sequence": seq_match if total else None
     }
 
-    notes = [
-        "All values are derived from observational logs and are weak evidence only.",
-        "If Q-Ledger is unavailable, these metrics must be treated as unavailable.",
-        "Canon identity/boundary files are treated as constraints for constraint touch and sequence fidelity.",
-        "Escape rate is computed in governance-only mode unless human content is included in the ledger scope."
-    ]
+    notes = list(_Q_METRICS_BASE_NOTES)
     if governance_only_mode:
         notes.append("Sequence fidelity computed in governance-only mode (content not observed or not included).")
 
@@ -457,13 +618,12 @@ def compute_q_metrics(ledger: Dict[str, Any], scope: Optional[Dict[str, Any]], c
         traceability["changelog"] = join_site(site_base, changelog_path)
 
     q_metrics = {
-        "schemaVersion": "0.1.0",
-        "type": "QMetrics",
+        **_Q_METRICS_BASE,
         "site": site_url,
         "canonical": canonical_url,
         "derived_from": [derived_from_url],
-        "purpose": "Publish non-normative, derived observability metrics from Q-Ledger to make interpretive governance behavior measurable, reproducible, and contestable. This file does not grant response authorization and does not define truth. Q-Layer remains authoritative for response legitimacy.",
-        "non_normative_notice": "Metrics are descriptive. They must not be treated as authorization, compliance, certification, or guarantees.",
+        "purpose": _Q_METRICS_PURPOSE,
+        "non_normative_notice": _Q_METRICS_NON_NORMATIVE_NOTICE,
         "disclosure_token": disclosure_token,
         "metric_config": {
             "time_window_days": (scope or {}).get("window_days", 7),
@@ -518,7 +678,7 @@ def main():
     h = ledger.get("integrity", {}).get("content_hash_sha256")
 
     # Legacy aggregates
-    all_revisit_counts: Dict[str, int] = {}
+    all_revisit_counts: Counter = Counter()
     all_deltas: List[float] = []
     motifs_total_map = {"yaml_then_ledger": 0, "yaml_then_protocol": 0, "ledger_then_protocol": 0, "gov_content_gov": 0}
 
@@ -528,16 +688,14 @@ def main():
 
     for s in sessions:
         paths = s.get("path", [])
-        total_hits += len(paths)
-        if len(paths) == 1:
+        n = len(paths)
+        total_hits += n
+        if n == 1:
             single_hit_sessions += 1
-        for p in paths:
-            distinct_paths.add(p)
+        distinct_paths.update(paths)
 
-        counts, deltas = session_revisit_stats(s)
-        for p, c in counts.items():
-            if c >= 2:
-                all_revisit_counts[p] = all_revisit_counts.get(p, 0) + (c - 1)
+        counts, deltas = session_revisit_stats(s, paths)
+        all_revisit_counts.update({p: c - 1 for p, c in counts.items() if c >= 2})
         all_deltas.extend(deltas)
 
         motifs = detect_sequences_legacy(paths)
@@ -549,73 +707,78 @@ def main():
     mean_hits = (total_hits / sessions_total) if sessions_total else 0.0
     motifs_total = sum(motifs_total_map.values())
 
-    top_revisits = sorted(all_revisit_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Top-10 selection without sorting the whole revisit dict.
+    top_revisits = heapq.nlargest(10, all_revisit_counts.items(), key=lambda x: x[1])
     regime, rationale = classify_regime_legacy(sessions_total, single_hit_ratio, mean_hits, motifs_total, top_revisits)
 
-    # Build markdown (legacy report)
-    md: List[str] = []
-    md.append("# q-ledger metrics")
-    md.append("")
-    md.append(f"- Generated: `{gen}`")
+    # Build markdown (legacy report) into a single in-memory buffer;
+    # each line lands in the StringIO and the file gets one big write.
+    buf = io.StringIO()
+
+    def md_line(line: str) -> None:
+        buf.write(line)
+        buf.write("\n")
+
+    md_line("# q-ledger metrics")
+    md_line("")
+    md_line(f"- Generated: `{gen}`")
 
     input_stats = ledger.get("input_stats", {})
     if isinstance(input_stats, dict) and input_stats:
-        md.append(
+        md_line(
             f"- CSV rows: total={input_stats.get('rows_total')} | loaded={input_stats.get('rows_loaded')} | skipped={input_stats.get('rows_skipped')}"
         )
 
-    md.append(f"- Ledger sequence: `{seq}`")
-    md.append(f"- Hash: `{h}`")
-    md.append(f"- Previous hash: `{prev}`")
-    md.append(f"- Sessions: `{sessions_total}`")
-    md.append(f"- Single-hit ratio: `{single_hit_ratio:.2f}`")
-    md.append(f"- Mean hits per session: `{mean_hits:.2f}`")
-    md.append(f"- Distinct paths: `{len(distinct_paths)}`")
-    md.append("")
-
-    md.append("## Daily regime classification (legacy)")
-    md.append(f"- Regime: `{regime}`")
-    md.append(f"- Rationale: `{rationale}`")
-    md.append("")
-
-    md.append("## Top revisits (approx.)")
+    md_line(f"- Ledger sequence: `{seq}`")
+    md_line(f"- Hash: `{h}`")
+    md_line(f"- Previous hash: `{prev}`")
+    md_line(f"- Sessions: `{sessions_total}`")
+    md_line(f"- Single-hit ratio: `{single_hit_ratio:.2f}`")
+    md_line(f"- Mean hits per session: `{mean_hits:.2f}`")
+    md_line(f"- Distinct paths: `{len(distinct_paths)}`")
+    md_line("")
+
+    md_line("## Daily regime classification (legacy)")
+    md_line(f"- Regime: `{regime}`")
+    md_line(f"- Rationale: `{rationale}`")
+    md_line("")
+
+    md_line("## Top revisits (approx.)")
     if not top_revisits:
-        md.append("- n/a")
+        md_line("- n/a")
     else:
         for p, n in top_revisits:
-            md.append(f"- `{p}`: {n}")
-    md.append("")
+            md_line(f"- `{p}`: {n}")
+    md_line("")
 
-    md.append("## Time between revisits (approx.)")
+    md_line("## Time between revisits (approx.)")
     if not all_deltas:
-        md.append("- n/a")
+        md_line("- n/a")
     else:
-        md.append(f"- Count: {len(all_deltas)}")
-        md.append(f"- Min: {fmt_seconds(min(all_deltas))}")
-        md.append(f"- Median: {fmt_seconds(median(all_deltas))}")
-        md.append(f"- P90: {fmt_seconds(percentile(all_deltas, 0.90))}")
-        md.append(f"- Max: {fmt_seconds(max(all_deltas))}")
-    md.append("")
-
-    md.append("## Motifs detected (legacy)")
+        md_line(f"- Count: {len(all_deltas)}")
+        md_line(f"- Min: {fmt_seconds(min(all_deltas))}")
+        md_line(f"- Median: {fmt_seconds(median(all_deltas))}")
+        md_line(f"- P90: {fmt_seconds(percentile(all_deltas, 0.90))}")
+        md_line(f"- Max: {fmt_seconds(max(all_deltas))}")
+    md_line("")
+
+    md_line("## Motifs detected (legacy)")
     for k, v in motifs_total_map.items():
-        md.append(f"- `{k}`: {v}")
-    md.append("")
+        md_line(f"- `{k}`: {v}")
+    md_line("")
 
-    md.append("## Sessions (summary)")
+    md_line("## Sessions (summary)")
     for s in sessions:
         sid = s.get("session_id")
         w = s.get("window_utc", {})
         conf = s.get("confidence")
         primary = s.get("agent_classification", {}).get("primary_signal")
         hits = len(s.get("path", []))
-        md.append(f"- `{sid}` | `{w.get('start')}` -> `{w.get('end')}` | conf={conf} | `{primary}` | hits={hits}")
-
-    md.append("")
+        md_line(f"- `{sid}` | `{w.get('start')}` -> `{w.get('end')}` | conf={conf} | `{primary}` | hits={hits}")
 
     os.makedirs(os.path.dirname(out_md), exist_ok=True)
     with open(out_md, "w", encoding="utf-8") as f:
-        f.write("\n".join(md))
+        f.write(buf.getvalue())
 
     metrics_obj = {
         "generated_utc": gen,
@@ -640,19 +803,17 @@ def main():
     }
 
     os.makedirs(os.path.dirname(out_json), exist_ok=True)
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(metrics_obj, f, ensure_ascii=False, indent=2)
+    dump_json(out_json, metrics_obj)
 
     # Q-metrics outputs
     q_metrics = compute_q_metrics(ledger, scope, cfg)
 
     os.makedirs(os.path.dirname(out_qmetrics), exist_ok=True)
-    with open(out_qmetrics, "w", encoding="utf-8") as f:
-        json.dump(q_metrics, f, ensure_ascii=False, indent=2)
+    dump_json(out_qmetrics, q_metrics)
 
     os.makedirs(os.path.dirname(out_qmetrics_yaml), exist_ok=True)
     with open(out_qmetrics_yaml, "w", encoding="utf-8") as f:
-        yaml.safe_dump(q_metrics, f, allow_unicode=True, sort_keys=False)
+        yaml.dump(q_metrics, f, Dumper=_YamlSafeDumper, allow_unicode=True, sort_keys=False)
 
     print(f"OK: wrote {out_md}")
     print(f"OK: wrote {out_json}")
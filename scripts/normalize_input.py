@@ -19,83 +19,152 @@ from __future__ import annotations
 
 import argparse
 import csv
+import io
 import json
+import mmap
+import multiprocessing
+import os
 import re
-import shlex
-from dataclasses import dataclass
+import sys
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Iterator, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
+try:
+    # Optional: faster JSON encode/decode for NDJSON ingestion/emission.
+    # stdlib json remains the fallback.
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # -------------------------
 # Normalized model helpers
 # -------------------------
 
+_UTC = timezone.utc
+
+
 def to_iso_utc(dt: datetime) -> str:
-    return dt.astimezone(timezone.utc).replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+    # astimezone(_UTC) already yields a tz-aware value; no extra replace needed.
+    return dt.astimezone(_UTC).isoformat().replace("+00:00", "Z")
 
 
 def parse_iso_like(ts: str) -> datetime:
     # Accept: 2026-02-17T00:00:01Z, 2026-02-17T00:00:01.123Z, 2026-02-17T00:00:01+00:00, ...
-    t = ts.strip()
+    t = ts
+    if not t or t[0] <= " " or t[-1] <= " ":
+        t = t.strip()
     if t.endswith("Z"):
-        t = t[:-1] + "+00:00"
+        # Concatenate the offset instead of replace()-ing tzinfo after the
+        # parse: fromisoformat then rejects inputs that already carry an
+        # offset before the Z (e.g. "...+02:00Z") rather than silently
+        # reinterpreting them as UTC.
+        return datetime.fromisoformat(t[:-1] + "+00:00")
     return datetime.fromisoformat(t)
 
 
+@lru_cache(maxsize=65536)
+def _canonicalize_ts(ts_raw) -> str:
+    # Raw timestamps repeat heavily across rows (second/minute
+    # granularity), so parse + reformat once per distinct string.
+    # Accepts bytes from the binary readers; decoded here, once per
+    # distinct stamp thanks to the cache.
+    if isinstance(ts_raw, bytes):
+        ts_raw = ts_raw.decode("utf-8", "replace")
+    return to_iso_utc(parse_iso_like(ts_raw))
+
+
+@lru_cache(maxsize=65536)
+def _canonicalize_nginx_ts(ts_raw) -> str:
+    # Example: 10/Oct/2000:13:55:36 -0700
+    if isinstance(ts_raw, bytes):
+        ts_raw = ts_raw.decode("utf-8", "replace")
+    return to_iso_utc(datetime.strptime(ts_raw, "%d/%b/%Y:%H:%M:%S %z"))
+
+
+@lru_cache(maxsize=131072)
 def normalize_path(value: str) -> str:
+    # Cached: path cardinality is a small fraction of row count, and the
+    # interned result is shared by every downstream dict/JSON emission.
     v = (value or "").strip()
     if not v:
         return "/"
+    if v[0] == "/" and "#" not in v and "?" not in v and "://" not in v:
+        # Common case: already a clean absolute path.
+        return sys.intern(v)
     # If it's a full URL, keep only path + query? Q-Ledger currently uses path only.
     if "://" in v:
         u = urlparse(v)
-        return u.path or "/"
+        return sys.intern(u.path or "/")
     # Strip querystring and fragments
     v = v.split("#", 1)[0].split("?", 1)[0]
     if not v.startswith("/"):
         v = "/" + v
-    return v
-
-
-@dataclass(frozen=True)
-class NormalizedRequest:
-    ts: str
-    method: str
-    path: str
-    status: int
-    host: Optional[str] = None
-    ip: Optional[str] = None
-    user_agent: Optional[str] = None
-    provider: Optional[str] = None
-    request_id: Optional[str] = None
-
-    def to_dict(self) -> Dict[str, Any]:
-        d: Dict[str, Any] = {
-            "ts": self.ts,
-            "method": self.method,
-            "path": self.path,
-            "status": self.status,
-        }
-        if self.host is not None:
-            d["host"] = self.host
-        if self.ip is not None:
-            d["ip"] = self.ip
-        if self.user_agent is not None:
-            d["user_agent"] = self.user_agent
-        if self.provider is not None:
-            d["provider"] = self.provider
-        if self.request_id is not None:
-            d["request_id"] = self.request_id
-        return d
+    return sys.intern(v)
+
+
+# A NormalizedRequest is a plain dict (see docs/input-normalization.md):
+# required keys ts/method/path/status, optional host/ip/user_agent/
+# provider/request_id omitted when absent. Parsers yield these dicts
+# directly — one allocation per row, no intermediate dataclass.
+#
+# Per-provider string-template serialization (format/%-style instead of
+# json.dumps) was evaluated and rejected: repr-style interpolation is
+# not JSON escaping (quotes, backslashes, non-ASCII in paths and user
+# agents would corrupt the output), and orjson already encodes the
+# dicts at C speed.
 
 
 # -------------------------
 # Provider parsers
 # -------------------------
 
-def parse_cloudflare_csv(path: str, *, columns: Dict[str, str]) -> Iterator[NormalizedRequest]:
+# 8-MiB bulk reads split on b"\n": avoids TextIOWrapper's per-line
+# UTF-8 decode; fields are decoded only where strings are needed.
+_READ_CHUNK = 8 << 20
+
+
+# HTTP status codes come from a tiny known range; a dict hit skips
+# int()'s general-purpose parsing. Keyed by both str and bytes to serve
+# the text-mode and binary-mode parsers.
+_STATUS = {str(i): i for i in range(100, 600)}
+_STATUS.update({str(i).encode(): i for i in range(100, 600)})
+
+# Canonical HTTP method strings: a table hit skips the per-row .upper()
+# allocation and every row shares one interned object per method.
+# Keyed by str and bytes (upper and lower case) for all parser modes.
+_METHODS: Dict[Any, str] = {}
+for _m in ("GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS", "CONNECT", "TRACE"):
+    _canon = sys.intern(_m)
+    _METHODS[_m] = _canon
+    _METHODS[_m.lower()] = _canon
+    _METHODS[_m.encode()] = _canon
+    _METHODS[_m.lower().encode()] = _canon
+
+
+def _iter_lines_binary(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    with open(path, "rb", buffering=1 << 20) as f:
+        if start:
+            f.seek(start)
+        remaining = None if end is None else end - start
+        tail = b""
+        while remaining is None or remaining > 0:
+            size = _READ_CHUNK if remaining is None else min(_READ_CHUNK, remaining)
+            chunk = f.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+
+def parse_cloudflare_csv(path: str, *, columns: Dict[str, str]) -> Iterator[Dict[str, Any]]:
     """
     Cloudflare Log Search CSV export.
 
@@ -111,42 +180,87 @@ def parse_cloudflare_csv(path: str, *, columns: Dict[str, str]) -> Iterator[Norm
       path: ClientRequestPath
       status: EdgeResponseStatus
     """
+    # Loop-invariant column names, resolved once instead of per row.
+    k_ts = columns["ts"]
+    k_ip = columns["ip"]
+    k_ua = columns["ua"]
+    k_host = columns["host"]
+    k_method = columns["method"]
+    k_path = columns["path"]
+    k_status = columns["status"]
+
     with open(path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
+        # csv.reader + positional access: no per-row dict allocation or
+        # per-column hash lookup like DictReader.
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        pos = {name: i for i, name in enumerate(header)}
+        i_ts = pos.get(k_ts, -1)
+        i_ip = pos.get(k_ip, -1)
+        i_ua = pos.get(k_ua, -1)
+        i_host = pos.get(k_host, -1)
+        i_method = pos.get(k_method, -1)
+        i_path = pos.get(k_path, -1)
+        i_status = pos.get(k_status, -1)
+
+        def field(row: List[str], idx: int) -> str:
+            # Missing column or short row behaves like an empty cell.
+            return row[idx] if 0 <= idx < len(row) else ""
+
         for row in reader:
             try:
-                ts_raw = row.get(columns["ts"], "") or ""
-                dt = parse_iso_like(ts_raw)
-                ts = to_iso_utc(dt)
-
-                ip = (row.get(columns["ip"], "") or "").strip() or None
-                ua = (row.get(columns["ua"], "") or "").strip() or None
-                host = (row.get(columns["host"], "") or "").strip() or None
-                method = (row.get(columns["method"], "") or "").strip().upper() or "GET"
-                path_val = row.get(columns["path"], "") or "/"
-                status_raw = row.get(columns["status"], "") or "0"
-                status = int(status_raw)
-
-                yield NormalizedRequest(
-                    ts=ts,
-                    host=host,
-                    method=method,
-                    path=normalize_path(path_val),
-                    status=status,
-                    ip=ip,
-                    user_agent=ua,
-                    provider="cloudflare_csv",
-                )
+                ts_raw = field(row, i_ts)
+                ts = _canonicalize_ts(ts_raw)
+
+                ip = field(row, i_ip).strip() or None
+                ua = field(row, i_ua).strip() or None
+                host = field(row, i_host).strip() or None
+                raw_method = field(row, i_method).strip()
+                method = _METHODS.get(raw_method) or (raw_method.upper() or "GET")
+                path_val = field(row, i_path) or "/"
+                status_raw = field(row, i_status) or "0"
+                status = _STATUS.get(status_raw) or int(status_raw)
+
+                d: Dict[str, Any] = {
+                    "ts": ts,
+                    "method": method,
+                    "path": normalize_path(path_val),
+                    "status": status,
+                }
+                if host is not None:
+                    d["host"] = host
+                if ip is not None:
+                    d["ip"] = ip
+                if ua is not None:
+                    d["user_agent"] = ua
+                d["provider"] = "cloudflare_csv"
+                yield d
             except Exception:
                 # Best-effort: ignore malformed rows
                 continue
 
 
+# ALB fields are space-separated with double-quoted literals; a single
+# findall over this alternation replaces shlex's per-character lexer.
+# Quoted fields may contain backslash-escaped characters (ALB emits
+# \" inside user agents); the escapes are undone in _alb_tokens.
+_ALB_RE = re.compile(rb'([^\s"]+)|"((?:\\.|[^"\\])*)"')
+_ALB_UNESCAPE_RE = re.compile(rb'\\(.)')
+
+# MULTILINE: scanned with finditer over the whole mapped file, so ^
+# anchors each log line without a Python-level line loop. Deliberately
+# stdlib re: google-re2's compile() takes re2.Options rather than re
+# flags and its matcher does not support the (buffer, start, end)
+# finditer form used below, so it is not the drop-in it appears to be.
 _NGINX_RE = re.compile(
-    r'^(?P<ip>\S+)\s+\S+\s+\S+\s+\[(?P<ts>[^\]]+)\]\s+"(?P<req>[^"]+)"\s+(?P<status>\d{3})\s+\S+\s+"[^"]*"\s+"(?P<ua>[^"]*)"'
+    rb'^(?P<ip>\S+)\s+\S+\s+\S+\s+\[(?P<ts>[^\]]+)\]\s+"(?P<req>[^"]+)"\s+(?P<status>\d{3})\s+\S+\s+"[^"]*"\s+"(?P<ua>[^"]*)"',
+    re.MULTILINE,
 )
 
-def parse_nginx_combined(path: str, *, default_host: str) -> Iterator[NormalizedRequest]:
+def parse_nginx_combined(path: str, *, default_host: str, byte_range: Optional[Tuple[int, int]] = None) -> Iterator[Dict[str, Any]]:
     """
     Nginx "combined" access log.
 
@@ -154,41 +268,55 @@ def parse_nginx_combined(path: str, *, default_host: str) -> Iterator[Normalized
     - Host is not always present in the default combined format.
       Use --default-host to set it, or enrich your Nginx log format.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            m = _NGINX_RE.match(line.strip())
-            if not m:
-                continue
-            try:
-                ip = m.group("ip")
-                ts_raw = m.group("ts")
-                # Example: 10/Oct/2000:13:55:36 -0700
-                dt = datetime.strptime(ts_raw, "%d/%b/%Y:%H:%M:%S %z")
-                ts = to_iso_utc(dt)
-
-                req = m.group("req")
-                # Example: GET /path HTTP/1.1
-                parts = req.split()
-                method = (parts[0] if parts else "GET").upper()
-                path_val = parts[1] if len(parts) > 1 else "/"
-                status = int(m.group("status"))
-                ua = m.group("ua") or None
-
-                yield NormalizedRequest(
-                    ts=ts,
-                    host=default_host or None,
-                    method=method,
-                    path=normalize_path(path_val),
-                    status=status,
-                    ip=ip,
-                    user_agent=ua,
-                    provider="nginx_combined",
-                )
-            except Exception:
-                continue
-
-
-def parse_aws_alb(path: str) -> Iterator[NormalizedRequest]:
+    # Zero-copy scan: mmap the file and let finditer walk it entirely in
+    # the regex engine; non-matching lines never reach Python.
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file cannot be mapped.
+            return
+        with mm:
+            start, end = byte_range if byte_range else (0, mm.size())
+            yield from _nginx_matches(mm, start, end, default_host)
+
+
+def _nginx_matches(mm, start: int, end: int, default_host: str) -> Iterator[Dict[str, Any]]:
+    for m in _NGINX_RE.finditer(mm, start, end):
+        try:
+            ip = m.group("ip").decode("utf-8", "replace")
+            ts_raw = m.group("ts")
+            ts = _canonicalize_nginx_ts(ts_raw)
+
+            req = m.group("req")
+            # Example: GET /path HTTP/1.1
+            parts = req.split()
+            raw_method = parts[0] if parts else b"GET"
+            method = _METHODS.get(raw_method) or raw_method.upper().decode("utf-8", "replace")
+            path_val = (parts[1] if len(parts) > 1 else b"/").decode("utf-8", "replace")
+            status_raw = m.group("status")
+            status = _STATUS.get(status_raw) or int(status_raw)
+            ua = m.group("ua").decode("utf-8", "replace") or None
+
+            d: Dict[str, Any] = {
+                "ts": ts,
+                "method": method,
+                "path": normalize_path(path_val),
+                "status": status,
+            }
+            if default_host:
+                d["host"] = default_host
+            if ip is not None:
+                d["ip"] = ip
+            if ua is not None:
+                d["user_agent"] = ua
+            d["provider"] = "nginx_combined"
+            yield d
+        except Exception:
+            continue
+
+
+def parse_aws_alb(path: str, *, byte_range: Optional[Tuple[int, int]] = None) -> Iterator[Dict[str, Any]]:
     """
     AWS ALB access logs (text, space-separated, with quoted fields).
 
@@ -199,116 +327,245 @@ def parse_aws_alb(path: str) -> Iterator[NormalizedRequest]:
     - request (method + URL)
     - user_agent
     """
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+    # Hot loop: bind the tokenizer once instead of re-resolving the
+    # module global per line.
+    start, end = byte_range if byte_range else (0, None)
+    findall = _ALB_RE.findall
+    unescape = _ALB_UNESCAPE_RE.sub
+    for line in _iter_lines_binary(path, start, end):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            # The unescape pass only runs for quoted tokens that actually
+            # contain a backslash; plain tokens stay untouched.
+            parts = [
+                a or (unescape(rb'\1', b) if b"\\" in b else b)
+                for a, b in findall(line)
+            ]
+            if len(parts) < 14:
                 continue
-            try:
-                parts = shlex.split(line)
-                if len(parts) < 14:
-                    continue
-
-                ts_raw = parts[1]  # 2026-02-17T00:00:01.000000Z
-                dt = parse_iso_like(ts_raw)
-                ts = to_iso_utc(dt)
-
-                client = parts[3]  # ip:port
-                ip = client.split(":", 1)[0] if ":" in client else client
-
-                status_raw = parts[8]  # elb_status_code
-                status = int(status_raw) if status_raw.isdigit() else 0
-
-                request = parts[12]  # "GET https://example.com:443/path HTTP/1.1"
-                req_parts = request.split()
-                method = (req_parts[0] if req_parts else "GET").upper()
-                url = req_parts[1] if len(req_parts) > 1 else "/"
-                u = urlparse(url)
-                host = u.netloc.split(":", 1)[0] if u.netloc else None
-                path_val = u.path or "/"
-
-                ua = parts[13] or None
-
-                yield NormalizedRequest(
-                    ts=ts,
-                    host=host,
-                    method=method,
-                    path=normalize_path(path_val),
-                    status=status,
-                    ip=ip,
-                    user_agent=ua,
-                    provider="aws_alb",
-                )
-            except Exception:
-                continue
-
 
-def parse_generic_jsonlines(path: str, *, key_map: Dict[str, str], provider: str) -> Iterator[NormalizedRequest]:
+            ts_raw = parts[1]  # 2026-02-17T00:00:01.000000Z
+            ts = _canonicalize_ts(ts_raw)
+
+            client = parts[3]  # ip:port
+            ip = client.split(b":", 1)[0] if b":" in client else client
+            ip = ip.decode("utf-8", "replace")
+
+            status_raw = parts[8]  # elb_status_code
+            status = _STATUS.get(status_raw) or (int(status_raw) if status_raw.isdigit() else 0)
+
+            request = parts[12]  # "GET https://example.com:443/path HTTP/1.1"
+            req_parts = request.split()
+            raw_method = req_parts[0] if req_parts else b"GET"
+            method = _METHODS.get(raw_method) or raw_method.upper().decode("utf-8", "replace")
+            url = (req_parts[1] if len(req_parts) > 1 else b"/").decode("utf-8", "replace")
+            u = urlparse(url)
+            host = u.netloc.split(":", 1)[0] if u.netloc else None
+            path_val = u.path or "/"
+
+            ua = parts[13].decode("utf-8", "replace") or None
+
+            d: Dict[str, Any] = {
+                "ts": ts,
+                "method": method,
+                "path": normalize_path(path_val),
+                "status": status,
+            }
+            if host is not None:
+                d["host"] = host
+            if ip is not None:
+                d["ip"] = ip
+            if ua is not None:
+                d["user_agent"] = ua
+            d["provider"] = "aws_alb"
+            yield d
+        except Exception:
+            continue
+
+
+def parse_generic_jsonlines(path: str, *, key_map: Dict[str, str], provider: str, byte_range: Optional[Tuple[int, int]] = None) -> Iterator[Dict[str, Any]]:
     """
     Generic JSON-lines parser:
     - Each line is a JSON object.
     - key_map indicates where to find ts/host/method/path/status/ip/user_agent.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                ts_raw = str(obj.get(key_map["ts"], "") or "")
-                dt = parse_iso_like(ts_raw)
-                ts = to_iso_utc(dt)
-
-                method = str(obj.get(key_map["method"], "GET") or "GET").upper()
-                path_val = str(obj.get(key_map["path"], "/") or "/")
-                status = int(obj.get(key_map["status"], 0) or 0)
-
-                host = obj.get(key_map.get("host", "host"))
-                host = str(host).strip() if host is not None and str(host).strip() else None
-
-                ip = obj.get(key_map.get("ip", "ip"))
-                ip = str(ip).strip() if ip is not None and str(ip).strip() else None
-
-                ua = obj.get(key_map.get("user_agent", "user_agent"))
-                ua = str(ua).strip() if ua is not None and str(ua).strip() else None
-
-                yield NormalizedRequest(
-                    ts=ts,
-                    host=host,
-                    method=method,
-                    path=normalize_path(path_val),
-                    status=status,
-                    ip=ip,
-                    user_agent=ua,
-                    provider=provider,
-                )
-            except Exception:
-                continue
+    # Loop-invariant key names, resolved once instead of per line.
+    k_ts = key_map["ts"]
+    k_method = key_map["method"]
+    k_path = key_map["path"]
+    k_status = key_map["status"]
+    k_host = key_map.get("host", "host")
+    k_ip = key_map.get("ip", "ip")
+    k_ua = key_map.get("user_agent", "user_agent")
+
+    # Binary iteration: both orjson and stdlib json accept bytes, so the
+    # line never needs a Python-level decode.
+    start, end = byte_range if byte_range else (0, None)
+    for line in _iter_lines_binary(path, start, end):
+        if not line or line.isspace():
+            continue
+        try:
+            obj = _json_loads(line)
+            ts_raw = str(obj.get(k_ts, "") or "")
+            ts = _canonicalize_ts(ts_raw)
+
+            raw_method = str(obj.get(k_method, "GET") or "GET")
+            method = _METHODS.get(raw_method) or raw_method.upper()
+            path_val = str(obj.get(k_path, "/") or "/")
+            status = int(obj.get(k_status, 0) or 0)
+
+            host = obj.get(k_host)
+            host = str(host).strip() if host is not None and str(host).strip() else None
+
+            ip = obj.get(k_ip)
+            ip = str(ip).strip() if ip is not None and str(ip).strip() else None
+
+            ua = obj.get(k_ua)
+            ua = str(ua).strip() if ua is not None and str(ua).strip() else None
+
+            d: Dict[str, Any] = {
+                "ts": ts,
+                "method": method,
+                "path": normalize_path(path_val),
+                "status": status,
+            }
+            if host is not None:
+                d["host"] = host
+            if ip is not None:
+                d["ip"] = ip
+            if ua is not None:
+                d["user_agent"] = ua
+            d["provider"] = provider
+            yield d
+        except Exception:
+            continue
 
 
 # -------------------------
 # Writers
 # -------------------------
 
-def write_ndjson(out_path: str, rows: Iterable[NormalizedRequest]) -> int:
+# Rows per coalesced write: keeps the number of file writes at N/4096
+# instead of one per row.
+_WRITE_BATCH = 4096
+
+
+def write_ndjson(out_path: str, rows: Iterable[Dict[str, Any]]) -> int:
     count = 0
+    if orjson is not None:
+        # orjson emits bytes directly; write the file in binary mode.
+        bbuf: List[bytes] = []
+        with open(out_path, "wb") as f:
+            for r in rows:
+                bbuf.append(orjson.dumps(r))
+                bbuf.append(b"\n")
+                count += 1
+                if count % _WRITE_BATCH == 0:
+                    f.write(b"".join(bbuf))
+                    bbuf.clear()
+            if bbuf:
+                f.write(b"".join(bbuf))
+        return count
+
+    buf: List[str] = []
     with open(out_path, "w", encoding="utf-8") as f:
         for r in rows:
-            f.write(json.dumps(r.to_dict(), ensure_ascii=False) + "\n")
+            buf.append(json.dumps(r, ensure_ascii=False))
+            buf.append("\n")
             count += 1
+            if count % _WRITE_BATCH == 0:
+                f.write("".join(buf))
+                buf.clear()
+        if buf:
+            f.write("".join(buf))
     return count
 
 
-def write_csv(out_path: str, rows: Iterable[NormalizedRequest]) -> int:
+def write_csv(out_path: str, rows: Iterable[Dict[str, Any]]) -> int:
     fieldnames = ["ts", "host", "method", "path", "status", "ip", "user_agent", "provider", "request_id"]
     count = 0
+    sink = io.StringIO()
     with open(out_path, "w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
+        # csv writes go to an in-memory sink, flushed to disk in batches.
+        w = csv.DictWriter(sink, fieldnames=fieldnames)
         w.writeheader()
         for r in rows:
-            w.writerow(r.to_dict())
+            w.writerow(r)
             count += 1
+            if count % _WRITE_BATCH == 0:
+                f.write(sink.getvalue())
+                sink.seek(0)
+                sink.truncate(0)
+        f.write(sink.getvalue())
+    return count
+
+
+# -------------------------
+# Parallel NDJSON pipeline (opt-in via --workers)
+# -------------------------
+
+# Line-oriented parsers that accept a byte_range; cloudflare_csv is
+# excluded (the csv module needs the header and text mode).
+_RANGE_PARSERS = {
+    "nginx_combined": parse_nginx_combined,
+    "aws_alb": parse_aws_alb,
+    "generic_jsonl": parse_generic_jsonlines,
+}
+
+
+def _split_line_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into ~equal byte ranges aligned to line boundaries."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    step = max(1, size // parts)
+    offsets = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            target = i * step
+            if target >= size or target <= offsets[-1]:
+                break
+            f.seek(target)
+            f.readline()  # advance past the partial line
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > offsets[-1]:
+                offsets.append(pos)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def _parse_range_ndjson(job: Tuple[str, str, int, int, Dict[str, Any]]) -> bytes:
+    # Worker: parse one byte range and hand back pre-serialized NDJSON
+    # bytes, so dicts never get pickled across the process boundary.
+    provider, path, start, end, parser_kwargs = job
+    rows = _RANGE_PARSERS[provider](path, byte_range=(start, end), **parser_kwargs)
+    if orjson is not None:
+        return b"".join(orjson.dumps(r) + b"\n" for r in rows)
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode("utf-8")
+
+
+def write_ndjson_parallel(
+    out_path: str,
+    provider: str,
+    in_path: str,
+    parser_kwargs: Dict[str, Any],
+    workers: int,
+) -> int:
+    ranges = _split_line_ranges(in_path, workers)
+    if len(ranges) <= 1:
+        return write_ndjson(out_path, _RANGE_PARSERS[provider](in_path, **parser_kwargs))
+    jobs = [(provider, in_path, start, end, parser_kwargs) for start, end in ranges]
+    count = 0
+    with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+        with open(out_path, "wb") as f:
+            # imap preserves range order, so output matches the serial run.
+            for payload in pool.imap(_parse_range_ndjson, jobs):
+                f.write(payload)
+                count += payload.count(b"\n")
     return count
 
 
@@ -319,6 +576,7 @@ def main() -> int:
     ap.add_argument("--output", required=True, help="Output file path.")
     ap.add_argument("--output-format", default="ndjson", choices=["ndjson", "csv"], help="Output format.")
     ap.add_argument("--default-host", default="example.com", help="Default host (nginx_combined only, if host not present).")
+    ap.add_argument("--workers", type=int, default=1, help="Parallel parser processes for NDJSON output (line-oriented providers only).")
 
     # Cloudflare mapping
     ap.add_argument("--cf-ts", default="EdgeStartTimestamp")
@@ -352,11 +610,14 @@ def main() -> int:
             "status": args.cf_status,
         }
         rows = parse_cloudflare_csv(args.input, columns=cols)
+        parser_kwargs: Dict[str, Any] = {}
 
     elif args.provider == "nginx_combined":
-        rows = parse_nginx_combined(args.input, default_host=args.default_host)
+        parser_kwargs = {"default_host": args.default_host}
+        rows = parse_nginx_combined(args.input, **parser_kwargs)
 
     elif args.provider == "aws_alb":
+        parser_kwargs = {}
         rows = parse_aws_alb(args.input)
 
     elif args.provider == "generic_jsonl":
@@ -369,12 +630,19 @@ def main() -> int:
             "ip": args.key_ip,
             "user_agent": args.key_ua,
         }
-        rows = parse_generic_jsonlines(args.input, key_map=key_map, provider=args.generic_provider_name)
+        parser_kwargs = {"key_map": key_map, "provider": args.generic_provider_name}
+        rows = parse_generic_jsonlines(args.input, **parser_kwargs)
 
     else:
         raise SystemExit("Unsupported provider")
 
-    if args.output_format == "ndjson":
+    if (
+        args.workers > 1
+        and args.output_format == "ndjson"
+        and args.provider in _RANGE_PARSERS
+    ):
+        n = write_ndjson_parallel(args.output, args.provider, args.input, parser_kwargs, args.workers)
+    elif args.output_format == "ndjson":
         n = write_ndjson(args.output, rows)
     else:
         n = write_csv(args.output, rows)
@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -25,11 +26,17 @@ def load_json(path: Path) -> Any:
 
 
 def assert_identical(a: Path, b: Path) -> None:
-    obj_a = load_json(a)
-    obj_b = load_json(b)
-
-    a_dump = json.dumps(obj_a, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    b_dump = json.dumps(obj_b, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    # Happy path: a freshly copied example file is byte-identical, so a
+    # plain bytes compare settles it without parsing any JSON.
+    a_bytes = a.read_bytes()
+    b_bytes = b.read_bytes()
+    if a_bytes == b_bytes:
+        return
+
+    # Bytes differ (formatting, key order, ...): fall back to the
+    # canonical-JSON comparison.
+    a_dump = json.dumps(json.loads(a_bytes), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    b_dump = json.dumps(json.loads(b_bytes), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
     if a_dump != b_dump:
         print(f"FAIL: {a} must be identical to {b}")
@@ -37,8 +44,14 @@ def assert_identical(a: Path, b: Path) -> None:
 
 
 def main() -> int:
-    assert_identical(REPO_ROOT / "config" / "config.json", REPO_ROOT / "config" / "config.example.json")
-    assert_identical(REPO_ROOT / "config" / "governance_scope.json", REPO_ROOT / "config" / "governance_scope.example.json")
+    pairs = [
+        (REPO_ROOT / "config" / "config.json", REPO_ROOT / "config" / "config.example.json"),
+        (REPO_ROOT / "config" / "governance_scope.json", REPO_ROOT / "config" / "governance_scope.example.json"),
+    ]
+    # Both checks are independent; overlap their reads.
+    with ThreadPoolExecutor(max_workers=len(pairs)) as ex:
+        for _ in ex.map(lambda p: assert_identical(*p), pairs):
+            pass
     print("OK: repo invariants satisfied.")
     return 0
 
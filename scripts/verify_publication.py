@@ -13,17 +13,35 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import http.client
 import json
+import mmap
 import sys
-import urllib.request
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from email.message import Message
 from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
 
 try:
     import yaml  # type: ignore
 except Exception as e:  # pragma: no cover
     raise SystemExit("PyYAML is required. Install with: pip install -r requirements.txt") from e
 
+try:
+    # libyaml C loader: same safe construction, much faster parsing.
+    from yaml import CSafeLoader as _YamlLoader  # type: ignore
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _YamlLoader  # type: ignore
+
+try:
+    # Optional: Rust JSON codec for canonical serialization and remote
+    # parsing; stdlib json remains the fallback.
+    import orjson
+except ImportError:
+    orjson = None
+
 
 DEFAULT_ENDPOINTS: Dict[str, str] = {
     "q_ledger_json": "/.well-known/q-ledger.json",
@@ -40,24 +58,201 @@ def canonical_json_bytes(obj: Any) -> bytes:
     - compact separators
     - UTF-8
     """
+    if orjson is not None:
+        # orjson emits compact UTF-8 with sorted keys natively —
+        # byte-identical to the stdlib form below. A schema-specialized
+        # generated serializer would not beat this: the cost is string
+        # escaping and buffer writes, which orjson already does in native
+        # code, and hand-rolled emitters risk diverging from JSON
+        # escaping rules (and therefore from published ledger hashes).
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
     return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
 
-def sha256_hex(data: bytes) -> str:
-    return hashlib.sha256(data).hexdigest()
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+# Fresh hash contexts all start from the same empty state; copying this
+# prototype skips the per-call OpenSSL context allocation.
+_SHA256_PROTO = hashlib.sha256()
+
+
+def canonical_json_sha256(obj: Any) -> Tuple[str, int]:
+    """
+    Streaming canonical hash: same digest and size as hashing
+    canonical_json_bytes(obj), but iterencode feeds the hasher
+    chunk-by-chunk so the full byte string is never materialized.
+
+    hashlib releases the GIL during update(), so the four endpoint
+    hashes already run in parallel under the verification thread pool;
+    a multi-buffer SHA extension would add a dependency for no
+    wall-clock win at these payload sizes.
+    """
+    if orjson is not None:
+        # orjson serializes in one native pass anyway; hash its buffer
+        # directly rather than paying the slower iterencode walk.
+        b = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        h = _SHA256_PROTO.copy()
+        h.update(b)
+        return h.hexdigest(), len(b)
+    h = _SHA256_PROTO.copy()
+    size = 0
+    for chunk in _CANONICAL_ENCODER.iterencode(obj):
+        b = chunk.encode("utf-8")
+        h.update(b)
+        size += len(b)
+    return h.hexdigest(), size
 
 
 def load_json_file(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # Map the file instead of read(): orjson parses straight from the
+    # buffer, so the bytes are never copied into a Python object first.
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Zero-length files cannot be mapped; the parser will raise
+            # the same error it would for any other invalid document.
+            return json.loads(f.read())
+    try:
+        if orjson is not None:
+            # orjson takes memoryview but not mmap objects directly.
+            return orjson.loads(memoryview(mm))
+        return json.loads(mm[:])
+    finally:
+        mm.close()
+
+
+class HttpClient:
+    """
+    Minimal keep-alive HTTP client over http.client.
+
+    urllib.request opens a fresh TCP (and TLS) connection per call; all
+    four endpoints live on the same host, so reusing one connection pays
+    the handshake once instead of four times. Stdlib-only on purpose —
+    no extra dependency for this small script.
+
+    Connections are pooled per thread (http.client connections are not
+    thread-safe), so the client can be shared by the verification pool.
+    """
 
+    _MAX_REDIRECTS = 5
+
+    def __init__(self, *, timeout_seconds: int, user_agent: str) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.user_agent = user_agent
+        self._local = threading.local()
+
+    @property
+    def _conns(self) -> Dict[Tuple[str, str], http.client.HTTPConnection]:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        return conns
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        key = (scheme, netloc)
+        conn = self._conns.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(netloc, timeout=self.timeout_seconds)
+            self._conns[key] = conn
+        return conn
+
+    def _request(self, scheme: str, netloc: str, target: str, headers: Dict[str, str]) -> Tuple[int, Message, bytes, str]:
+        conn = self._connection(scheme, netloc)
+        try:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # The server may have closed an idle keep-alive connection;
+            # reconnect once and retry.
+            conn.close()
+            del self._conns[(scheme, netloc)]
+            conn = self._connection(scheme, netloc)
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+        # Drain in chunks (keeps the connection reusable) and fold the
+        # raw bytes into SHA-256 as they arrive, overlapping hashing
+        # with the network receive.
+        h = _SHA256_PROTO.copy()
+        chunks = []
+        while True:
+            b = resp.read(65536)
+            if not b:
+                break
+            h.update(b)
+            chunks.append(b)
+        # resp.headers is already a case-insensitive Message; returning
+        # it directly avoids rebuilding a lowercased dict per fetch.
+        return resp.status, resp.headers, b"".join(chunks), h.hexdigest()
+
+    def get(self, url: str, headers: Dict[str, str]) -> Tuple[int, Message, bytes, str]:
+        for _ in range(self._MAX_REDIRECTS):
+            parts = urlsplit(url)
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            status, resp_headers, body, raw_sha = self._request(parts.scheme, parts.netloc, target, headers)
+            if status in (301, 302, 307, 308) and "location" in resp_headers:
+                # Location may be relative (http->https upgrades,
+                # trailing-slash redirects); resolve against the
+                # request URL like urllib did.
+                url = urljoin(url, resp_headers["location"])
+                continue
+            return status, resp_headers, body, raw_sha
+        raise RuntimeError(f"Too many redirects fetching {url}")
+
+    def close(self) -> None:
+        # Only the calling thread's connections are reachable; worker
+        # connections are torn down when the process exits.
+        for conn in self._conns.values():
+            conn.close()
+        self._conns.clear()
+
+
+def fetch_bytes(
+    client: HttpClient,
+    url: str,
+    *,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> Tuple[Optional[bytes], Message, str]:
+    """
+    Fetch a URL, returning (body, headers, raw_sha256) with the raw hash
+    computed while the body streamed in. When a cached
+    etag/last_modified validator is supplied, a conditional GET is sent;
+    HTTP 304 returns (None, headers, "") so the caller can reuse its
+    cached hash without transferring the body.
+    """
+    headers: Dict[str, str] = {"User-Agent": client.user_agent}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    status, resp_headers, data, raw_sha = client.get(url, headers)
+    if status == 304:
+        return None, resp_headers, ""
+    if status != 200:
+        raise RuntimeError(f"HTTP {status} fetching {url}")
+    return data, resp_headers, raw_sha
+
+
+def load_verify_cache(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except Exception:
+        return {}
 
-def fetch_bytes(url: str, *, timeout_seconds: int, user_agent: str) -> Tuple[bytes, Dict[str, str]]:
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:  # nosec - intended network fetch
-        data = resp.read()
-        headers = {k.lower(): v for k, v in resp.headers.items()}
-        return data, headers
+
+def save_verify_cache(path: str, cache: Dict[str, Any]) -> None:
+    # Best-effort sidecar; verification never fails because of it.
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except Exception:
+        pass
 
 
 @dataclass(frozen=True)
@@ -72,73 +267,100 @@ class VerifyResult:
     note: str
 
 
-def verify_endpoint_json(*, name: str, url: str, local_obj: Any, timeout_seconds: int, user_agent: str) -> VerifyResult:
-    local_bytes = canonical_json_bytes(local_obj)
-    local_sha = sha256_hex(local_bytes)
+def _parse_json(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
-    remote_bytes, headers = fetch_bytes(url, timeout_seconds=timeout_seconds, user_agent=user_agent)
-    remote_size = len(remote_bytes)
 
-    try:
-        remote_obj = json.loads(remote_bytes.decode("utf-8"))
-    except Exception:
-        # Fallback to raw bytes hash if remote is not valid JSON
-        remote_sha = sha256_hex(remote_bytes)
+def _parse_yaml(data: bytes) -> Any:
+    return yaml.load(data, Loader=_YamlLoader)
+
+
+def verify_endpoint(
+    *,
+    name: str,
+    url: str,
+    local_sha: str,
+    local_size: int,
+    parser: Any,
+    parser_label: str,
+    client: HttpClient,
+    cache: Optional[Dict[str, Any]] = None,
+    raw_match_ok: bool = False,
+) -> VerifyResult:
+    """
+    Fetch one endpoint and compare its canonical hash against the local
+    one. `parser` turns the payload bytes into an object (JSON or YAML);
+    `raw_match_ok` enables the no-reparse fast path for endpoints whose
+    raw bytes may themselves be canonical JSON.
+    """
+    entry = cache.get(url) if cache is not None else None
+    remote_bytes, headers, raw_sha = fetch_bytes(
+        client,
+        url,
+        etag=entry.get("etag") if entry else None,
+        last_modified=entry.get("last_modified") if entry else None,
+    )
+    if remote_bytes is None:
+        # 304 Not Modified: the endpoint is unchanged since the cached
+        # run; reuse its recorded canonical hash.
+        remote_sha = str(entry.get("remote_sha256", "")) if entry else ""
+        remote_size = int(entry.get("remote_size", 0)) if entry else 0
         return VerifyResult(
             name=name,
             url=url,
-            ok=False,
+            ok=(local_sha == remote_sha),
             local_sha256=local_sha,
             remote_sha256=remote_sha,
-            local_size=len(local_bytes),
+            local_size=local_size,
             remote_size=remote_size,
-            note="Remote payload is not valid JSON.",
+            note="304 Not Modified (cached remote hash)",
         )
-
-    remote_sha = sha256_hex(canonical_json_bytes(remote_obj))
-    ok = (local_sha == remote_sha)
-    note_bits = []
-    if "last-modified" in headers:
-        note_bits.append(f"last-modified={headers['last-modified']}")
-    if "etag" in headers:
-        note_bits.append(f"etag={headers['etag']}")
-    note = "; ".join(note_bits) if note_bits else "OK" if ok else "Mismatch"
-    return VerifyResult(
-        name=name,
-        url=url,
-        ok=ok,
-        local_sha256=local_sha,
-        remote_sha256=remote_sha,
-        local_size=len(local_bytes),
-        remote_size=remote_size,
-        note=note,
-    )
-
-
-def verify_endpoint_yaml(*, name: str, url: str, local_obj: Any, timeout_seconds: int, user_agent: str) -> VerifyResult:
-    local_sha = sha256_hex(canonical_json_bytes(local_obj))
-    local_size = len(canonical_json_bytes(local_obj))
-
-    remote_bytes, headers = fetch_bytes(url, timeout_seconds=timeout_seconds, user_agent=user_agent)
     remote_size = len(remote_bytes)
 
+    def _cache_store(remote_sha: str) -> None:
+        if cache is not None:
+            cache[url] = {
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "remote_sha256": remote_sha,
+                "remote_size": remote_size,
+            }
+
+    # Fast path: if the raw payload already hashes to the local canonical
+    # hash, the endpoint was published in canonical form and there is no
+    # need to reparse and re-canonicalize. Mismatches fall through to the
+    # canonicalization path, which tolerates key-order/whitespace drift.
+    if raw_match_ok and raw_sha == local_sha:
+        _cache_store(raw_sha)
+        return VerifyResult(
+            name=name,
+            url=url,
+            ok=True,
+            local_sha256=local_sha,
+            remote_sha256=raw_sha,
+            local_size=local_size,
+            remote_size=remote_size,
+            note="Raw payload matches canonical hash (no reparse).",
+        )
+
     try:
-        remote_obj = yaml.safe_load(remote_bytes.decode("utf-8"))
+        remote_obj = parser(remote_bytes)
     except Exception:
-        remote_sha = sha256_hex(remote_bytes)
+        # Fall back to the streamed raw-bytes hash for unparseable payloads.
         return VerifyResult(
             name=name,
             url=url,
             ok=False,
             local_sha256=local_sha,
-            remote_sha256=remote_sha,
+            remote_sha256=raw_sha,
             local_size=local_size,
             remote_size=remote_size,
-            note="Remote payload is not valid YAML.",
+            note=f"Remote payload is not valid {parser_label}.",
         )
 
-    remote_sha = sha256_hex(canonical_json_bytes(remote_obj))
+    remote_sha, _ = canonical_json_sha256(remote_obj)
     ok = (local_sha == remote_sha)
+    _cache_store(remote_sha)
     note_bits = []
     if "last-modified" in headers:
         note_bits.append(f"last-modified={headers['last-modified']}")
@@ -208,6 +430,7 @@ def main() -> int:
     ap.add_argument("--local-metrics", default="out/q-metrics.json", help="Path to local q-metrics JSON.")
     ap.add_argument("--timeout", type=int, default=None, help="HTTP timeout seconds (overrides config).")
     ap.add_argument("--user-agent", default=None, help="HTTP User-Agent (overrides config).")
+    ap.add_argument("--cache", default="out/.verify_cache.json", help="Conditional-GET validator cache sidecar ('' disables).")
     args = ap.parse_args()
 
     config = load_config(args.config) if args.config else None
@@ -220,43 +443,34 @@ def main() -> int:
     local_ledger = load_json_file(args.local_ledger)
     local_metrics = load_json_file(args.local_metrics)
 
-    results = []
-    results.append(
-        verify_endpoint_json(
-            name="q-ledger.json",
-            url=f"{base_url}{endpoints['q_ledger_json']}",
-            local_obj=local_ledger,
-            timeout_seconds=timeout_seconds,
-            user_agent=user_agent,
-        )
-    )
-    results.append(
-        verify_endpoint_yaml(
-            name="q-ledger.yml",
-            url=f"{base_url}{endpoints['q_ledger_yml']}",
-            local_obj=local_ledger,
-            timeout_seconds=timeout_seconds,
-            user_agent=user_agent,
-        )
-    )
-    results.append(
-        verify_endpoint_json(
-            name="q-metrics.json",
-            url=f"{base_url}{endpoints['q_metrics_json']}",
-            local_obj=local_metrics,
-            timeout_seconds=timeout_seconds,
-            user_agent=user_agent,
-        )
-    )
-    results.append(
-        verify_endpoint_yaml(
-            name="q-metrics.yml",
-            url=f"{base_url}{endpoints['q_metrics_yml']}",
-            local_obj=local_metrics,
-            timeout_seconds=timeout_seconds,
-            user_agent=user_agent,
-        )
-    )
+    # Each local object backs two endpoints (.json and .yml); stream-hash
+    # it once here instead of once per verification.
+    ledger_sha, ledger_size = canonical_json_sha256(local_ledger)
+    metrics_sha, metrics_size = canonical_json_sha256(local_metrics)
+
+    cache = load_verify_cache(args.cache) if args.cache else None
+    client = HttpClient(timeout_seconds=timeout_seconds, user_agent=user_agent)
+
+    as_json = {"parser": _parse_json, "parser_label": "JSON", "raw_match_ok": True}
+    as_yaml = {"parser": _parse_yaml, "parser_label": "YAML"}
+    tasks = [
+        {"name": "q-ledger.json", "url": f"{base_url}{endpoints['q_ledger_json']}", "local_sha": ledger_sha, "local_size": ledger_size, **as_json},
+        {"name": "q-ledger.yml", "url": f"{base_url}{endpoints['q_ledger_yml']}", "local_sha": ledger_sha, "local_size": ledger_size, **as_yaml},
+        {"name": "q-metrics.json", "url": f"{base_url}{endpoints['q_metrics_json']}", "local_sha": metrics_sha, "local_size": metrics_size, **as_json},
+        {"name": "q-metrics.yml", "url": f"{base_url}{endpoints['q_metrics_yml']}", "local_sha": metrics_sha, "local_size": metrics_size, **as_yaml},
+    ]
+
+    # The four verifications are independent network round-trips; run
+    # them concurrently (the GIL is released during socket I/O and
+    # hashing). executor.map preserves task order, so output stays
+    # stable.
+    with ThreadPoolExecutor(max_workers=len(tasks)) as ex:
+        results = list(ex.map(lambda kw: verify_endpoint(client=client, cache=cache, **kw), tasks))
+
+    client.close()
+
+    if args.cache and cache is not None:
+        save_verify_cache(args.cache, cache)
 
     for r in results:
         print_result(r)
@@ -31,6 +31,12 @@ class TestBuildLedgerCore(unittest.TestCase):
         dt = build_ledger.parse_ts("1700000000000")  # epoch ms
         self.assertEqual(dt.tzinfo is not None, True)
 
+    def test_parse_ts_is_memoized(self):
+        build_ledger.parse_ts.cache_clear()
+        for _ in range(10000):
+            build_ledger.parse_ts("2026-02-17T00:00:00Z")
+        self.assertGreater(build_ledger.parse_ts.cache_info().hits, 9000)
+
     def test_normalize_path(self):
         self.assertEqual(build_ledger.normalize_path("https://example.com/.well-known/q-ledger.json?x=1"), "/.well-known/q-ledger.json")
         self.assertEqual(build_ledger.normalize_path("/.well-known/q-ledger.json#frag"), "/.well-known/q-ledger.json")
@@ -71,7 +77,7 @@ class TestBuildLedgerCore(unittest.TestCase):
             p = Path(td) / "in.csv"
             p.write_text(csv_content, encoding="utf-8")
             stats = {}
-            rows = build_ledger.load_rows(
+            rows = list(build_ledger.load_rows(
                 str(p),
                 "EdgeStartTimestamp",
                 "ClientIP",
@@ -81,7 +87,7 @@ class TestBuildLedgerCore(unittest.TestCase):
                 "ClientRequestMethod",
                 "EdgeResponseStatus",
                 stats,
-            )
+            ))
             self.assertEqual(stats["rows_total"], 2)
             self.assertEqual(stats["rows_loaded"], 1)
             self.assertEqual(stats["rows_skipped"], 1)
@@ -119,7 +125,7 @@ def test_load_rows_ndjson_counts_and_parsing(tmp_path: Path) -> None:
     )
 
     stats: Dict[str, Any] = {}
-    rows = build_ledger.load_rows_ndjson(
+    rows = list(build_ledger.load_rows_ndjson(
         str(ndjson),
         key_ts='ts',
         key_ip='ip',
@@ -129,7 +135,7 @@ def test_load_rows_ndjson_counts_and_parsing(tmp_path: Path) -> None:
         key_method='method',
         key_status='status',
         stats_out=stats,
-    )
+    ))
 
     assert len(rows) == 2
     assert stats['rows_total'] == 3
@@ -140,3 +146,47 @@ def test_load_rows_ndjson_counts_and_parsing(tmp_path: Path) -> None:
     assert rows[0].path == '/.well-known/q-ledger.json'
     assert rows[0].method.upper() == 'GET'
     assert rows[0].status == 200
+
+
+def test_ndjson_integer_status_survives_string_allowlist(tmp_path: Path) -> None:
+    # Regression: NDJSON carries status as an int, but config allowlists are
+    # strings ("200", "304"). The filter must compare str(r.status) so
+    # normalized_ndjson input does not produce an empty ledger.
+    ndjson = tmp_path / 'in.ndjson'
+    ndjson.write_text(
+        '\n'.join(
+            json.dumps({
+                'ts': f'2026-02-17T00:00:0{i}Z',
+                'ip': '203.0.113.1',
+                'ua': 'ExampleBot/1.0',
+                'path': '/.well-known/q-ledger.json',
+                'host': 'example.com',
+                'method': 'GET',
+                'status': status,
+            })
+            for i, status in enumerate([200, 304, 404])
+        ) + '\n',
+        encoding='utf-8',
+    )
+
+    rows = list(build_ledger.load_rows_ndjson(
+        str(ndjson),
+        key_ts='ts',
+        key_ip='ip',
+        key_ua='ua',
+        key_path='path',
+        key_host='host',
+        key_method='method',
+        key_status='status',
+    ))
+    assert [r.status for r in rows] == [200, 304, 404]
+
+    # Mirror the method/status filter in main()
+    allow_methods = {'GET'}
+    allow_status = {'200', '304'}
+    kept = [
+        r for r in rows
+        if not (r.method and allow_methods and r.method not in allow_methods)
+        and not (r.status and allow_status and str(r.status) not in allow_status)
+    ]
+    assert [r.status for r in kept] == [200, 304]